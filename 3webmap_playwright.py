@@ -7,36 +7,119 @@ build a hierarchical tree from URL paths, and visualize it
 as a collapsible left-to-right D3 tree.
 
 Key behaviour:
-- Headed Chromium (browser visible)
+- Headless Chromium by default (--headed to watch the crawl)
 - Deep scroll per page
-- Reuse same tab
+- Several browser contexts crawl concurrently (one reused tab each)
 - Click up to 50 clickable elements per page to discover routes
-- Extract links from fully rendered HTML via BeautifulSoup
+- Extract links from the rendered DOM in a single page.evaluate
 """
 
 import os
 import json
-import time
+import asyncio
 import argparse
 import webbrowser
-from collections import deque
+from functools import lru_cache
 from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 
 import re
 import requests
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from requests.adapters import HTTPAdapter
+from lxml import etree, html as lxml_html
+from playwright.async_api import async_playwright, TimeoutError
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+# Compiled once; only <a href> values are needed for static link discovery.
+_HREF_XPATH = etree.XPath("//a/@href")
+
+# One pass over the rendered DOM: same-domain anchors and data-url targets
+# (resolved to absolute URLs) plus raw onclick handlers, each deduplicated.
+_EXTRACT_LINKS_JS = """
+(domain) => {
+  const sameDomain = (raw) => {
+    try {
+      const u = new URL(raw, document.baseURI);
+      return u.host === domain ? u.href : null;
+    } catch (e) {
+      return null;
+    }
+  };
+
+  const anchors = new Set();
+  for (const a of document.querySelectorAll("a[href]")) {
+    const href = a.getAttribute("href").trim();
+    if (!href || /^(javascript:|mailto:|tel:|#)/.test(href)) continue;
+    const full = sameDomain(href);
+    if (full) anchors.add(full);
+  }
+
+  const onclicks = new Set();
+  for (const el of document.querySelectorAll("[onclick]")) {
+    const script = el.getAttribute("onclick");
+    if (script) onclicks.add(script);
+  }
+
+  const dataUrls = new Set();
+  for (const el of document.querySelectorAll("[data-url]")) {
+    const raw = el.getAttribute("data-url");
+    const full = raw && sameDomain(raw);
+    if (full) dataUrls.add(full);
+  }
+
+  return {
+    anchors: [...anchors],
+    onclicks: [...onclicks],
+    dataUrls: [...dataUrls],
+  };
+}
+"""
+
+# onclick URL patterns used by extract_dom_links
+_RE_QUOTED_ABS = re.compile(r"['\"](https?://[^'\"]+)['\"]")
+_RE_QUOTED_ROOT = re.compile(r"['\"](/[^'\"]+)['\"]")
+_RE_CALL_PATH = re.compile(r"\((['\"])(/[^'\"]+)\1\)")
+
+# Chromium flags for a non-interactive crawl: no GPU compositing, no images
+_CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--blink-settings=imagesEnabled=false",
+]
+
+# Request types that never carry links; aborted before they hit the network
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+
+# Linked files that Chromium would download rather than render as a page
+_SKIP_SUFFIXES = (
+    ".pdf", ".zip", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".mp4", ".webp", ".ico",
+)
+
+# Agent name matched against robots.txt rules (see User-Agent in fetch_html)
+_ROBOTS_AGENT = "WebMapBot"
 
 
 # -------------------------------------------------------
 # BASIC STATIC FETCH + LINK EXTRACT (FALLBACK)
 # -------------------------------------------------------
 
+# Shared across fallback fetches so connections (and TLS sessions) are reused;
+# pool sized for several crawl workers falling back at once
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0 (compatible; WebMapBot/1.0)"})
+_ADAPTER = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+
+
 def fetch_html(url, timeout=15):
     """Simple requests-based fetch used as a fallback when Playwright fails."""
-    headers = {"User-Agent": "Mozilla/5.0 (compatible; WebMapBot/1.0)"}
     try:
-        r = requests.get(url, headers=headers, timeout=timeout)
+        r = _SESSION.get(url, timeout=timeout)
         if r.status_code == 200:
             return r.text
     except Exception as e:
@@ -44,19 +127,26 @@ def fetch_html(url, timeout=15):
     return None
 
 
+def extract_hrefs(html):
+    """Return raw href values of all <a> tags in `html` (empty if unparsable)."""
+    try:
+        doc = lxml_html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return []
+    return _HREF_XPATH(doc)
+
+
 def extract_links_static(base_url, html):
-    """Extract internal links from static HTML using BeautifulSoup."""
-    soup = BeautifulSoup(html, "html.parser")
+    """Extract internal links from static HTML using lxml."""
     links = set()
-    domain = urlparse(base_url).netloc
+    in_domain = make_domain_check(_urlparse_cached(base_url).netloc)
 
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
+    for href in extract_hrefs(html):
+        href = href.strip()
         if href.startswith(("javascript:", "mailto:", "tel:", "#")):
             continue
         absolute = urljoin(base_url, href)
-        parsed = urlparse(absolute)
-        if parsed.netloc == domain:
+        if in_domain(absolute):
             links.add(normalize(absolute))
 
     return links
@@ -66,228 +156,324 @@ def extract_links_static(base_url, html):
 # NORMALIZATION
 # -------------------------------------------------------
 
+# The same URLs are parsed during extraction, queueing and tree building.
+_urlparse_cached = lru_cache(maxsize=8192)(urlparse)
+
+
+@lru_cache(maxsize=8192)
 def normalize(link: str) -> str:
     """Normalize URLs by stripping anchors, query params, and trailing slash."""
     if not link:
         return link
+    # Fast path: already canonical, nothing to strip
+    if "#" not in link and "?" not in link and link[-1] != "/":
+        return link
     link = link.split("#", 1)[0]
     link = link.split("?", 1)[0]
     return link.rstrip("/")
 
 
+def make_domain_check(domain):
+    """
+    Return a `url -> bool` test equivalent to urlparse(url).netloc == domain
+    for absolute http(s) URLs, using only str.startswith on the hot path.
+    """
+    prefixes = tuple(
+        f"{scheme}://{domain}{sep}"
+        for scheme in ("http", "https")
+        for sep in ("/", "?", "#")
+    )
+    bare = {f"http://{domain}", f"https://{domain}"}
+
+    def in_domain(url):
+        return url.startswith(prefixes) or url in bare
+
+    return in_domain
+
+
+# -------------------------------------------------------
+# CRAWL FILTERS
+# -------------------------------------------------------
+
+def load_robots(start_url, timeout=10):
+    """
+    Fetch and parse robots.txt for the start URL's host.
+
+    Returns None (allow everything) unless robots.txt comes back 200: a
+    403 from bot protection or a flaky 5xx must not stop the crawl.
+    """
+    parsed = urlparse(start_url)
+    robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+    try:
+        r = _SESSION.get(robots_url, timeout=timeout)
+    except Exception as e:
+        print("[robots-error]", e)
+        return None
+    if r.status_code != 200:
+        print("[robots-skip]", robots_url, "->", r.status_code)
+        return None
+
+    robots = RobotFileParser(robots_url)
+    robots.parse(r.text.splitlines())
+    return robots
+
+
+def is_crawlable(url, robots):
+    """False for linked binary files and for URLs robots.txt disallows."""
+    if url.lower().endswith(_SKIP_SUFFIXES):
+        return False
+    return robots is None or robots.can_fetch(_ROBOTS_AGENT, url)
+
+
 # -------------------------------------------------------
 # UPGRADED PLAYWRIGHT CRAWLER
 # -------------------------------------------------------
 
-def crawl(start_url, max_pages=150, delay=0.3, max_clicks_per_page=50):
+async def crawl(start_url, max_pages=150, delay=0.3, max_clicks_per_page=50,
+                concurrency=4, headless=True):
     """
-    Crawl site using Playwright (headed Chromium, one tab reused).
+    Crawl site using Playwright (Chromium, headless unless `headless=False`,
+    `concurrency` browser contexts pulling from one shared queue, one tab
+    reused per context).
 
     Per page:
       - Load with JS (domcontentloaded)
       - Deep scroll to trigger lazy loads
-      - Extract links from fully rendered HTML using BeautifulSoup
-      - Additionally inspect onclick / data-url attributes
+      - Extract anchor, onclick and data-url links from the rendered DOM
       - Click up to `max_clicks_per_page` clickable elements
         to discover routes that only appear after interaction.
 
+    Discovered links are only queued if they pass is_crawlable (no binary
+    files, nothing robots.txt disallows), so they never cost a navigation.
+
     Fallback to static HTML if Playwright completely fails.
     """
     visited = set()
-    queue = deque([start_url])
+    queue = asyncio.Queue()
+    queue.put_nowait(start_url)
+    frontier = {start_url}  # mirrors `queue` for O(1) dedup on enqueue
     pages = {}
     domain = urlparse(start_url).netloc
+    in_domain = make_domain_check(domain)
+    # Single-domain crawl, so robots.txt is fetched once up front
+    robots = await asyncio.to_thread(load_robots, start_url)
+
+    # All workers share one event loop, so the check-and-update blocks on
+    # visited / frontier / pages below (no awaits in between) are atomic.
+    async def worker(tab):
+        while True:
+            url = await queue.get()
+            try:
+                frontier.discard(url)
+                if url in visited or len(visited) >= max_pages:
+                    continue
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)
-        tab = browser.new_page()
-
-        while queue and len(pages) < max_pages:
-            url = queue.popleft()
-            if url in visited:
-                continue
-
-            visited.add(url)
-            print("\n[render]", url)
+                visited.add(url)
+                all_links = await crawl_page(
+                    tab, url, domain, in_domain, max_clicks_per_page
+                )
+                pages[url] = {"links": list(all_links)}
 
-            all_links = set()
-            page_ok = False
+                # Queue discovered links
+                for link in all_links:
+                    if (link not in visited and link not in frontier
+                            and len(pages) + queue.qsize() < max_pages * 2
+                            and is_crawlable(link, robots)):
+                        queue.put_nowait(link)
+                        frontier.add(link)
 
-            # 1) Load page with Playwright
-            try:
-                tab.goto(url, timeout=60000, wait_until="domcontentloaded")
-                page_ok = True
-            except TimeoutError:
-                print("[timeout]", url)
+                await asyncio.sleep(delay)
             except Exception as e:
-                print("[playwright-error]", url, "->", e)
+                print("[worker-error]", url, "->", e)
+            finally:
+                queue.task_done()
+
+    async with async_playwright() as p:
+        launch_args = _CHROMIUM_ARGS + (["--headless=new"] if headless else [])
+        browser = await p.chromium.launch(headless=headless, args=launch_args)
+        # Set up every tab before starting workers, so a setup failure
+        # raises here instead of leaving queue.join() waiting forever
+        contexts = []
+        tabs = []
+        for _ in range(max(1, concurrency)):
+            ctx = await browser.new_context()
+            contexts.append(ctx)
+            await ctx.route("**/*", block_heavy_resources)
+            tabs.append(await ctx.new_page())
+        workers = [asyncio.create_task(worker(tab)) for tab in tabs]
+
+        await queue.join()
+
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for ctx in contexts:
+            await ctx.close()
+        await browser.close()
 
-            if page_ok:
-                # 2) Deep scroll to trigger lazy-loaded content
-                try:
-                    last_height = 0
-                    for _ in range(20):
-                        tab.mouse.wheel(0, 2500)
-                        time.sleep(0.4)
-                        new_height = tab.evaluate("document.body.scrollHeight")
-                        if new_height == last_height:
-                            break
-                        last_height = new_height
-                except Exception as e:
-                    print("[scroll-error]", url, "->", e)
+    return pages
 
-                time.sleep(0.5)
 
-                # 3) Expand common menus (click + hover) before extracting links
-                try:
-                    expand_menus(tab)
-                    time.sleep(0.5)
-                except Exception as e:
-                    print("[menu-expand-error]", url, "->", e)
+async def block_heavy_resources(route):
+    """Route handler: abort images, fonts, media and CSS; continue the rest."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
 
-                # 4) Extract links from fully rendered HTML via BeautifulSoup
-                html_links = extract_links_from_dom(tab, domain)
-                onclick_links, router_links = extract_js_nav_links(tab, url, domain)
-                all_links |= html_links | onclick_links | router_links
 
-                print(f"[links-basic] anchors={len(html_links)} onclick={len(onclick_links)} data-url={len(router_links)}")
+async def crawl_page(tab, url, domain, in_domain, max_clicks_per_page):
+    """Render one URL in `tab` and return the set of internal links found."""
+    print("\n[render]", url)
 
-                # 5) Click-discovery of navigation (up to N clicks)
-                discovered_via_clicks = click_discover_links(
-                    tab, url, domain, max_clicks=max_clicks_per_page
-                )
-                print(f"[links-click] discovered={len(discovered_via_clicks)}")
-                all_links |= discovered_via_clicks
+    all_links = set()
+    page_ok = False
 
-            # ---- Fallback path: Playwright unreachable AND no links ----
-            if not all_links and not page_ok:
-                html = fetch_html(url)
-                if html:
-                    print("[fallback-static]", url)
-                    static_links = extract_links_static(url, html)
-                    all_links = set(static_links)
-                else:
-                    print("[skip] no content available for", url)
+    # 1) Load page with Playwright
+    try:
+        await tab.goto(url, timeout=60000, wait_until="domcontentloaded")
+        page_ok = True
+    except TimeoutError:
+        print("[timeout]", url)
+    except Exception as e:
+        print("[playwright-error]", url, "->", e)
 
-            pages[url] = {"links": list(all_links)}
+    if page_ok:
+        # 2) Deep scroll to trigger lazy-loaded content
+        try:
+            last_height = 0
+            for _ in range(20):
+                await tab.mouse.wheel(0, 2500)
+                await asyncio.sleep(0.4)
+                new_height = await tab.evaluate("document.body.scrollHeight")
+                if new_height == last_height:
+                    break
+                last_height = new_height
+        except Exception as e:
+            print("[scroll-error]", url, "->", e)
 
-            # Queue discovered links
-            for link in all_links:
-                if link not in visited and len(pages) + len(queue) < max_pages * 2:
-                    queue.append(link)
+        await asyncio.sleep(0.5)
 
-            time.sleep(delay)
+        # 3) Expand common menus (click + hover) before extracting links
+        try:
+            await expand_menus(tab)
+            await asyncio.sleep(0.5)
+        except Exception as e:
+            print("[menu-expand-error]", url, "->", e)
+
+        # 4) Extract anchor / onclick / data-url links from the live DOM
+        html_links, onclick_links, router_links = await extract_dom_links(
+            tab, url, domain, in_domain
+        )
+        all_links |= html_links | onclick_links | router_links
 
-        browser.close()
+        print(f"[links-basic] anchors={len(html_links)} onclick={len(onclick_links)} data-url={len(router_links)}")
 
-    return pages
+        # 5) Click-discovery of navigation (up to N clicks)
+        discovered_via_clicks = await click_discover_links(
+            tab, url, in_domain, max_clicks=max_clicks_per_page
+        )
+        print(f"[links-click] discovered={len(discovered_via_clicks)}")
+        all_links |= discovered_via_clicks
+
+    # ---- Fallback path: Playwright unreachable AND no links ----
+    if not all_links and not page_ok:
+        html = await asyncio.to_thread(fetch_html, url)
+        if html:
+            print("[fallback-static]", url)
+            static_links = extract_links_static(url, html)
+            all_links = set(static_links)
+        else:
+            print("[skip] no content available for", url)
 
+    return all_links
 
-def extract_links_from_dom(tab, domain):
-    """
-    Extract internal links from the fully rendered HTML using BeautifulSoup.
 
-    This is more robust than querying DOM via JS because it sees the
-    final HTML after Webflow/JS manipulations.
+async def extract_dom_links(tab, base_url, domain, in_domain):
     """
-    links = set()
-    try:
-        html = tab.content()
-    except Exception as e:
-        print("[dom-content-error]", "->", e)
-        return links
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        if href.startswith(("javascript:", "mailto:", "tel:", "#")):
-            continue
-        absolute = urljoin(tab.url, href)
-        parsed = urlparse(absolute)
-        if parsed.netloc == domain:
-            links.add(normalize(absolute))
-
-    return links
+    Extract internal links from the live rendered DOM in one evaluate call.
 
+    The page returns same-domain <a href> and data-url targets (already
+    resolved to absolute URLs) plus raw onclick handler strings, so the
+    DOM is walked once and crosses the JS/Python boundary once.
 
-def extract_js_nav_links(tab, base_url, domain):
-    """
-    Extract navigation URLs from onclick handlers and data-url attributes.
-    Handles:
+    onclick handlers are parsed here in Python and cover:
       - onclick="location.href('/path')"
       - onclick="goToPage('/path')" (generic function call with path)
-      - data-url="/path"
+
+    Returns (anchor_links, onclick_links, data_url_links).
     """
+    html_links = set()
     onclick_links = set()
     router_links = set()
 
-    # onclick handlers
     try:
-        onclick_attrs = tab.eval_on_selector_all(
-            "*[onclick]",
-            "els => els.map(e => e.getAttribute('onclick'))"
-        )
+        found = await tab.evaluate(_EXTRACT_LINKS_JS, domain)
     except Exception as e:
-        print("[onclick-extract-error]", "->", e)
-        onclick_attrs = []
-
-    for script in onclick_attrs:
-        if not script:
-            continue
-
-        path_val = None
+        print("[dom-extract-error]", "->", e)
+        return html_links, onclick_links, router_links
 
-        # 1) Direct absolute or root-relative URL inside quotes
-        m = re.search(r"['\"](https?://[^'\"]+)['\"]", script)
-        if m:
-            path_val = m.group(1)
-        else:
-            m = re.search(r"['\"](/[^'\"]+)['\"]", script)
-            if m:
-                path_val = m.group(1)
+    for link in found["anchors"]:
+        html_links.add(normalize(link))
 
-        # 2) Generic function call goToPage('/path')
-        if not path_val:
-            m = re.search(r"\((['\"])(/[^'\"]+)\1\)", script)
-            if m:
-                path_val = m.group(2)
+    for link in found["dataUrls"]:
+        router_links.add(normalize(link))
 
+    for script in found["onclicks"]:
+        path_val = parse_onclick_path(script)
         if path_val:
             full = urljoin(base_url, path_val)
-            parsed = urlparse(full)
-            if parsed.netloc == domain:
+            if in_domain(full):
                 onclick_links.add(normalize(full))
 
-    # data-url-style attributes
-    try:
-        data_urls = tab.eval_on_selector_all(
-            "*[data-url]",
-            "els => els.map(e => e.getAttribute('data-url'))"
-        )
-    except Exception as e:
-        print("[data-url-extract-error]", "->", e)
-        data_urls = []
+    return html_links, onclick_links, router_links
 
-    for link in data_urls:
-        if not link:
-            continue
-        full = urljoin(base_url, link)
-        parsed = urlparse(full)
-        if parsed.netloc == domain:
-            router_links.add(normalize(full))
 
-    return onclick_links, router_links
+def parse_onclick_path(script):
+    """Return the URL or root-relative path an onclick handler navigates to."""
+    # 1) Direct absolute or root-relative URL inside quotes
+    m = _RE_QUOTED_ABS.search(script)
+    if m:
+        return m.group(1)
+    m = _RE_QUOTED_ROOT.search(script)
+    if m:
+        return m.group(1)
 
+    # 2) Generic function call goToPage('/path')
+    m = _RE_CALL_PATH.search(script)
+    if m:
+        return m.group(2)
 
-def expand_menus(tab):
+    return None
+
+
+def needs_click(info):
+    """
+    True if clicking is the only way to learn where a candidate leads.
+
+    Real anchors, data-url elements and onclick handlers with a parseable
+    path are already covered by extract_dom_links, so they are skipped.
+    """
+    if not info["visible"]:
+        return False
+    href = (info["href"] or "").strip()
+    if href and not href.startswith(("javascript:", "#")):
+        return False
+    if info["dataUrl"]:
+        return False
+    if info["onclick"] and parse_onclick_path(info["onclick"]):
+        return False
+    return True
+
+
+async def expand_menus(tab):
     """
     Best-effort expansion of Webflow-style / nav menus using
     click + hover (M3 strategy).
     """
     try:
         # Click hamburger / nav toggles / dropdown toggles
-        toggles = tab.query_selector_all(
+        toggles = await tab.query_selector_all(
             ".w-dropdown-toggle, .nav_humburg, .nav_humburg.home, .nav_humburg.no_gap"
         )
     except Exception:
@@ -295,26 +481,27 @@ def expand_menus(tab):
 
     for el in toggles:
         try:
-            el.click(timeout=2000)
-            time.sleep(0.2)
+            await el.click(timeout=2000)
+            await asyncio.sleep(0.2)
         except Exception:
             pass
 
     # Hover over dropdown toggles to open menus
     try:
-        hover_targets = tab.query_selector_all(".w-dropdown, .w-dropdown-toggle")
+        hover_targets = await tab.query_selector_all(".w-dropdown, .w-dropdown-toggle")
     except Exception:
         hover_targets = []
 
     for el in hover_targets:
         try:
-            tab.mouse.move(el.bounding_box()["x"] + 2, el.bounding_box()["y"] + 2)
-            tab.wait_for_timeout(200)
+            box = await el.bounding_box()
+            await tab.mouse.move(box["x"] + 2, box["y"] + 2)
+            await tab.wait_for_timeout(200)
         except Exception:
             pass
 
 
-def click_discover_links(tab, base_url, domain, max_clicks=50):
+async def click_discover_links(tab, base_url, in_domain, max_clicks=50):
     """
     Click up to `max_clicks` clickable elements on the page to discover
     new routes that only appear after interaction.
@@ -322,42 +509,50 @@ def click_discover_links(tab, base_url, domain, max_clicks=50):
     Strategy:
       - Collect broadly clickable elements:
         a, button, [role=button], [onclick], [role=link], [role=menuitem]
-      - Click each once, wait for possible navigation
+      - Probe visibility, href, onclick and data-url in one evaluate call
+      - Click only visible ones whose target isn't already known
+        (see needs_click), wait briefly for possible navigation
       - If URL changes and stays on same domain, record it and go back
     """
     discovered = set()
 
     try:
-        handles = tab.query_selector_all(
+        handles = await tab.query_selector_all(
             "a, button, [role='button'], [onclick], [role='link'], [role='menuitem']"
         )
+        if not handles:
+            return discovered
+        # One round-trip for every candidate probe instead of one per handle
+        infos = await tab.evaluate(
+            """els => els.map(e => {
+                const r = e.getBoundingClientRect();
+                return {
+                    visible: r.width > 0 && r.height > 0,
+                    href: e.tagName === "A" ? e.getAttribute("href") : null,
+                    onclick: e.getAttribute("onclick"),
+                    dataUrl: e.getAttribute("data-url"),
+                };
+            })""",
+            handles,
+        )
     except Exception as e:
         print("[click-targets-error]", "->", e)
         return discovered
 
-    if not handles:
-        return discovered
-
-    print(f"[click-discover] candidates={len(handles)} (max {max_clicks})")
+    targets = [el for el, info in zip(handles, infos) if needs_click(info)]
+    print(f"[click-discover] candidates={len(targets)}/{len(handles)} (max {max_clicks})")
     clicks_done = 0
 
-    for el in handles:
+    for el in targets:
         if clicks_done >= max_clicks:
             break
 
-        try:
-            box = el.bounding_box()
-            if not box:
-                continue
-        except Exception:
-            continue
-
         before_url = tab.url
         nav_happened = False
 
         try:
-            with tab.expect_navigation(wait_until="domcontentloaded", timeout=8000):
-                el.click()
+            async with tab.expect_navigation(wait_until="domcontentloaded", timeout=2000):
+                await el.click()
             nav_happened = True
         except TimeoutError:
             # Might be in-page JS, not full navigation
@@ -370,17 +565,16 @@ def click_discover_links(tab, base_url, domain, max_clicks=50):
 
         if nav_happened:
             new_url = normalize(tab.url)
-            parsed = urlparse(new_url)
-            if parsed.netloc == domain and new_url != normalize(before_url):
+            if in_domain(new_url) and new_url != normalize(before_url):
                 print("  [click-nav]", before_url, "->", new_url)
                 discovered.add(new_url)
 
             # attempt to go back
             try:
-                tab.go_back(timeout=8000, wait_until="domcontentloaded")
+                await tab.go_back(timeout=8000, wait_until="domcontentloaded")
             except Exception:
                 try:
-                    tab.goto(before_url, timeout=60000, wait_until="domcontentloaded")
+                    await tab.goto(before_url, timeout=60000, wait_until="domcontentloaded")
                 except Exception as e:
                     print("[back-failed]", before_url, "->", e)
                     break
@@ -401,7 +595,7 @@ def build_tree(start_url, pages):
 
     url_by_path = {}
     for url in pages.keys():
-        parsed = urlparse(url)
+        parsed = _urlparse_cached(url)
         norm = parsed.path.strip("/")
         url_by_path[norm] = url
 
@@ -409,48 +603,35 @@ def build_tree(start_url, pages):
         "name": domain,
         "url": start_url,
         "children": [],
-        "_path": ""
     }
 
-    def find_or_create(parent, seg_path, label):
-        for child in parent["children"]:
-            if child["_path"] == seg_path:
-                return child
-
-        node_url = url_by_path.get(seg_path, None)
-        new_child = {
-            "name": label,
-            "url": node_url,
-            "children": [],
-            "_path": seg_path,
-        }
-        parent["children"].append(new_child)
-        return new_child
+    # One flat index over the whole tree: "a/b" -> node for /a/b
+    nodes_by_path = {"": root}
 
     for url in pages.keys():
-        parsed = urlparse(url)
+        parsed = _urlparse_cached(url)
         norm_path = parsed.path.strip("/")
         if norm_path == "":
             continue
 
-        segments = norm_path.split("/")
         node = root
-        accumulated = []
-
-        for seg in segments:
-            accumulated.append(seg)
-            seg_path = "/".join(accumulated)
-            node = find_or_create(node, seg_path, seg)
+        seg_path = ""
+
+        for seg in norm_path.split("/"):
+            parent = node
+            seg_path = seg_path + "/" + seg if seg_path else seg
+            node = nodes_by_path.get(seg_path)
+            if node is None:
+                node = {
+                    "name": seg,
+                    "url": url_by_path.get(seg_path, None),
+                    "children": [],
+                }
+                parent["children"].append(node)
+                nodes_by_path[seg_path] = node
 
         node["url"] = url
 
-    # cleanup internal key
-    def clean(n):
-        n.pop("_path", None)
-        for c in n.get("children", []):
-            clean(c)
-
-    clean(root)
     return root
 
 
@@ -458,11 +639,7 @@ def build_tree(start_url, pages):
 # D3 COLLAPSIBLE TREE VIEWER (LEFT-TO-RIGHT)
 # -------------------------------------------------------
 
-def build_html(html_path, tree):
-    os.makedirs(os.path.dirname(html_path), exist_ok=True)
-    json_str = json.dumps(tree, indent=2, ensure_ascii=False)
-
-    template = """
+_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -702,9 +879,29 @@ if (!treeData.children || treeData.children.length === 0) {
 </html>
 """
 
-    html = template.replace("__JSON__", json_str)
-    with open(html_path, "w", encoding="utf-8") as f:
-        f.write(html)
+# Split once at the data marker so build_html can write the JSON between them
+_TEMPLATE_HEAD, _TEMPLATE_TAIL = (
+    part.encode("utf-8") for part in _TEMPLATE.split("__JSON__")
+)
+
+
+def to_json_bytes(obj, pretty=False):
+    """Serialize `obj` to UTF-8 JSON bytes (orjson if installed, else json)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def build_html(html_path, tree):
+    os.makedirs(os.path.dirname(html_path), exist_ok=True)
+
+    with open(html_path, "wb") as f:
+        f.write(_TEMPLATE_HEAD)
+        # Compact: the viewer only JSON.parse()s it; tree_hybrid.json stays pretty
+        f.write(to_json_bytes(tree))
+        f.write(_TEMPLATE_TAIL)
 
     print("✔ HTML saved →", html_path)
 
@@ -717,6 +914,8 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--url", required=True)
     parser.add_argument("--max-pages", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--headed", action="store_true")
     args = parser.parse_args()
 
     start_url = normalize(args.url)
@@ -725,7 +924,14 @@ def main():
 
     print("[start-url]", start_url)
 
-    pages = crawl(start_url, max_pages=args.max_pages)
+    pages = asyncio.run(
+        crawl(
+            start_url,
+            max_pages=args.max_pages,
+            concurrency=args.concurrency,
+            headless=not args.headed,
+        )
+    )
 
     if not pages:
         print("⚠ No pages collected. Exiting without HTML generation.")
@@ -736,8 +942,8 @@ def main():
     os.makedirs("outputs", exist_ok=True)
 
     json_path = os.path.join("outputs", "tree_hybrid.json")
-    with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(tree, f, indent=2)
+    with open(json_path, "wb") as f:
+        f.write(to_json_bytes(tree, pretty=True))
     print("✔ JSON saved →", json_path)
 
     html_path = os.path.join("outputs", "site_map_view.html")
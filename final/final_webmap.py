@@ -9,13 +9,14 @@ Usage:
     python final_webmap.py --url https://python.org --max-pages 50
 
 Behavior:
-- Uses Playwright (headed, browser visible)
+- Uses Playwright (headless; --headed to watch), several contexts in parallel
 - Scrolls and expands basic menus
-- Extracts internal links from fully rendered HTML (BeautifulSoup)
+- Extracts internal links from the live rendered DOM (page.evaluate)
 - Builds hierarchical tree based on URL path depth (T3)
 - Labels nodes with path only (e.g. "/downloads", "/downloads/windows")
 - Root node label style: "domain/"
 - Saves:
+    outputs/sitemap_hier.jsonl  (one {"url", "links"} record per page, as crawled)
     outputs/sitemap_hier.json   (adjacency: url -> links)
     outputs/tree_final.json     (hierarchical tree)
     outputs/sitemap_tree_final.html  (D3 interactive view)
@@ -23,22 +24,86 @@ Behavior:
 
 import os
 import json
-import time
+import asyncio
 import argparse
 import webbrowser
-from collections import deque
-from urllib.parse import urljoin, urlparse
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from urllib.parse import urlparse
 
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, TimeoutError
+from playwright.async_api import async_playwright, TimeoutError
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to stdlib json
+    orjson = None
 
 
 # -------------------------------------------------------
 # UTILS
 # -------------------------------------------------------
 
+# Resolved hrefs that never lead to another page (empty and "#..." hrefs
+# are dropped in _ANCHOR_HREFS_JS, before the browser resolves them)
+_BAD_PREFIXES = ("javascript:", "mailto:", "tel:")
+
+# Resolved a.href of every anchor whose raw href is not empty or in-page
+_ANCHOR_HREFS_JS = """
+() => Array.from(document.querySelectorAll('a[href]'))
+  .filter(a => {
+    const raw = a.getAttribute('href').trim();
+    return raw && !raw.startsWith('#');
+  })
+  .map(a => a.href)
+"""
+
+# Click each visible, non-submit element matching any selector once (DOM click)
+_EXPAND_MENUS_JS = """
+(sels) => {
+  const done = new Set();
+  for (const s of sels) {
+    for (const el of document.querySelectorAll(s)) {
+      if (done.has(el)) continue;
+      done.add(el);
+      // Hidden elements and submit buttons would navigate the tab away
+      if (!el.getClientRects().length) continue;
+      if (el.form && el.type === "submit") continue;
+      try { el.click(); } catch (e) {}
+    }
+  }
+}
+"""
+
+# Request types irrelevant to link extraction (skipped unless --load-assets)
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+# Scroll to the bottom until the page stops growing, one frame per step
+_SCROLL_JS = """
+async () => {
+  let h = 0;
+  for (let i = 0; i < 20; i++) {
+    window.scrollTo(0, document.body.scrollHeight);
+    await new Promise(r => requestAnimationFrame(r));
+    if (document.body.scrollHeight === h) break;
+    h = document.body.scrollHeight;
+  }
+}
+"""
+
+
+@lru_cache(maxsize=131072)
+def _pu(url: str):
+    """Cached urlparse: the same URLs are parsed during crawl and tree build."""
+    return urlparse(url)
+
+
+@lru_cache(maxsize=131072)
 def normalize(url: str) -> str:
-    """Strip fragment, query, and trailing slash (except for bare domain)."""
+    """
+    Strip fragment, query, and trailing slash (except for bare domain).
+
+    The output contains no "#" or "?"; build_tree_from_pages() relies on it.
+    """
     if not url:
         return url
     url = url.split("#", 1)[0]
@@ -56,52 +121,69 @@ def normalize(url: str) -> str:
     return url
 
 
+@lru_cache(maxsize=131072)
 def root_domain(url: str) -> str:
     """Return root domain without leading www."""
-    p = urlparse(url)
+    p = _pu(url)
     net = p.netloc.lower()
     return net[4:] if net.startswith("www.") else net
 
 
+def to_json_bytes(obj, pretty: bool = False) -> bytes:
+    """Serialize obj to UTF-8 JSON bytes (orjson if installed, else json)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _same_domain(url: str, root_dom: str, root_dom_dot: str) -> bool:
+    """
+    True if url is on root_dom or one of its subdomains.
+
+    root_dom_dot is "." + root_dom, precomputed by the caller, so that
+    e.g. "foo-python.org" is not mistaken for a python.org subdomain.
+    """
+    netloc = _pu(url).netloc.lower()
+    netcmp = netloc[4:] if netloc.startswith("www.") else netloc
+    return netcmp == root_dom or netcmp.endswith(root_dom_dot)
+
+
 # -------------------------------------------------------
-# LINK EXTRACTION FROM RENDERED HTML
+# LINK EXTRACTION FROM RENDERED DOM
 # -------------------------------------------------------
 
-def extract_links_from_dom(tab, root_dom: str):
-    """Extract internal links from rendered HTML via BeautifulSoup."""
-    links = set()
+async def extract_links_from_dom(tab, root_dom: str, root_dom_dot: str):
+    """
+    Extract internal links straight from the live DOM.
+
+    a.href is already resolved against the page URL by the browser, so
+    there is no HTML serialization, re-parse, or urljoin on our side.
+    In-page ("#...") and empty hrefs are skipped on the raw attribute,
+    since resolved they would point back at the page itself.
+    """
     try:
-        html = tab.content()
+        hrefs = await tab.evaluate(_ANCHOR_HREFS_JS)
     except Exception as e:
         print("[dom-error]", e)
-        return links
-
-    soup = BeautifulSoup(html, "html.parser")
-
-    for a in soup.find_all("a", href=True):
-        href = a["href"].strip()
-        if not href:
-            continue
-        if href.startswith(("javascript:", "mailto:", "tel:", "#")):
-            continue
-
-        full = urljoin(tab.url, href)
-        parsed = urlparse(full)
-        netloc = parsed.netloc.lower()
-        netcmp = netloc[4:] if netloc.startswith("www.") else netloc
+        return set()
 
-        if netcmp.endswith(root_dom):
-            links.add(normalize(full))
-
-    return links
+    # Dedupe first (nav/footer links repeat a lot), then cheap prefix
+    # rejects, and only then the parse-based domain check and normalize.
+    full = {h for h in hrefs if h and not h.startswith(_BAD_PREFIXES)}
+    return {normalize(u) for u in full if _same_domain(u, root_dom, root_dom_dot)}
 
 
 # -------------------------------------------------------
 # MENU EXPANSION (GENERIC, LIGHTWEIGHT)
 # -------------------------------------------------------
 
-def expand_menus(tab):
-    """Best-effort generic menu expansion (click + small waits)."""
+async def expand_menus(tab):
+    """
+    Best-effort generic menu expansion: click every matching element in
+    one page.evaluate call, then allow a single short settle.
+    """
     selectors = [
         ".w-dropdown-toggle",
         "button",
@@ -110,167 +192,333 @@ def expand_menus(tab):
         ".navbar",
         ".nav_humburg",
     ]
-    for sel in selectors:
-        try:
-            elements = tab.query_selector_all(sel)
-        except Exception:
-            elements = []
-        for el in elements:
-            try:
-                el.click(timeout=800)
-                tab.wait_for_timeout(150)
-            except Exception:
-                continue
+    try:
+        await tab.evaluate(_EXPAND_MENUS_JS, selectors)
+        await tab.wait_for_timeout(200)
+    except Exception as e:
+        print("[menu-error]", e)
 
 
 # -------------------------------------------------------
 # CLICK DISCOVERY (SMALL, TO AVOID EXPLOSION)
 # -------------------------------------------------------
 
-def click_discover(tab, root_dom: str, max_clicks: int = 5):
+_CLICKABLE = "a, button, [role='button'], [onclick], [role='link'], [role='menuitem']"
+
+# CSS path (tag:nth-of-type chain) that re-finds an element in a fresh copy of the page
+_CSS_PATH_JS = """
+el => {
+  const parts = [];
+  for (let e = el; e && e.nodeType === 1 && e !== document.documentElement; e = e.parentElement) {
+    let i = 1;
+    for (let s = e.previousElementSibling; s; s = s.previousElementSibling) {
+      if (s.tagName === e.tagName) i++;
+    }
+    parts.unshift(e.tagName.toLowerCase() + ':nth-of-type(' + i + ')');
+  }
+  return 'html > ' + parts.join(' > ');
+}
+"""
+
+
+async def click_discover(tab, root_dom: str, root_dom_dot: str, open_context, max_clicks: int = 5):
     """
     Try a few clicks on obvious clickable elements to discover routes
     that only appear after interaction. Very limited by max_clicks.
+
+    Clicks happen on one throwaway page (context from open_context()), so
+    the crawl tab never navigates away. That page is rendered like the
+    crawl tab (render_page) and only re-rendered after a click moved it;
+    candidates that are not visible there are skipped.
     """
     discovered = set()
     try:
-        candidates = tab.query_selector_all(
-            "a, button, [role='button'], [onclick], [role='link'], [role='menuitem']"
-        )
+        candidates = await tab.query_selector_all(_CLICKABLE)
     except Exception:
         return discovered
 
-    clicks = 0
+    # Pick visible candidates and remember how to find them again
+    before = tab.url
+    selectors = []
     for el in candidates:
-        if clicks >= max_clicks:
+        if len(selectors) >= max_clicks:
             break
-
         try:
-            box = el.bounding_box()
-            if not box:
+            if not await el.bounding_box():
                 continue
+            selectors.append(await el.evaluate(_CSS_PATH_JS))
         except Exception:
             continue
 
-        before = tab.url
-        nav_happened = False
-
-        try:
-            with tab.expect_navigation(timeout=7000):
-                el.click()
-            nav_happened = True
-        except TimeoutError:
-            if tab.url != before:
-                nav_happened = True
-        except Exception:
-            pass
-
-        clicks += 1
+    if not selectors:
+        return discovered
 
-        if nav_happened:
-            new = normalize(tab.url)
-            parsed = urlparse(new)
-            netloc = parsed.netloc.lower()
-            netcmp = netloc[4:] if netloc.startswith("www.") else netloc
+    ctx = None
+    try:
+        ctx = await open_context()
+        p2 = await ctx.new_page()
+        stale = True  # p2 is not (or no longer) showing a settled `before`
+        for sel in selectors:
+            try:
+                if stale:
+                    if not await render_page(p2, before):
+                        break
+                    stale = False
+                    settled = p2.url
+                el = await p2.query_selector(sel)
+                if el is None or not await el.is_visible():
+                    continue
+                try:
+                    async with p2.expect_navigation(timeout=7000):
+                        # Bounded: a click that can't land must not wait 30s
+                        await el.click(timeout=5000)
+                except TimeoutError:
+                    pass
+                if p2.url == settled:
+                    continue
+                # Only a click that moved p2 costs a reload
+                stale = True
+                new = normalize(p2.url)
+            except Exception as e:
+                print("[click-error]", before, "->", e)
+                stale = True
+                continue
 
-            if netcmp.endswith(root_dom) and new != normalize(before):
+            if _same_domain(new, root_dom, root_dom_dot) and new != normalize(before):
                 print("  [click-nav]", before, "->", new)
                 discovered.add(new)
-
-            # try to go back so we don't drift away
-            try:
-                tab.go_back(timeout=7000)
-            except Exception:
-                try:
-                    tab.goto(before, timeout=60000)
-                except Exception as e:
-                    print("[back-failed]", before, "->", e)
-                    break
+    except Exception as e:
+        print("[click-error]", before, "->", e)
+    finally:
+        if ctx is not None:
+            await ctx.close()
 
     return discovered
 
 
+# -------------------------------------------------------
+# BROWSER LIFECYCLE (LAUNCH OR ATTACH TO WARM DAEMON)
+# -------------------------------------------------------
+
+DEFAULT_CDP_ENDPOINT = "http://127.0.0.1:9222"
+
+
+@asynccontextmanager
+async def browser_handle(headless: bool = True):
+    """
+    Yield a Chromium Browser for one crawl.
+
+    With WEBMAP_DAEMON=1, attach over CDP to the warm browser kept alive by
+    final_webmap_daemon.py (endpoint from WEBMAP_CDP_ENDPOINT) and skip the
+    process spawn; otherwise launch a fresh Chromium. Closing an
+    attached browser only drops our contexts and disconnects.
+    """
+    async with async_playwright() as p:
+        if os.environ.get("WEBMAP_DAEMON") == "1":
+            endpoint = os.environ.get("WEBMAP_CDP_ENDPOINT", DEFAULT_CDP_ENDPOINT)
+            print("[browser] attaching to", endpoint)
+            browser = await p.chromium.connect_over_cdp(endpoint)
+        else:
+            browser = await p.chromium.launch(headless=headless)
+        try:
+            yield browser
+        finally:
+            await browser.close()
+
+
 # -------------------------------------------------------
 # CRAWLER
 # -------------------------------------------------------
 
-def crawl(start_url: str, max_pages: int = 50):
+async def crawl(start_url: str, max_pages: int = 50, concurrency: int = 4,
+                load_assets: bool = False, headless: bool = True,
+                journal_path: str = None):
     """
-    Simple BFS crawler using Playwright (headed).
-    Returns adjacency dict: { url: [links...] }
+    BFS crawler using Playwright: one browser, `concurrency`
+    contexts (one reused tab each) pulling URLs from a shared queue.
+    Images, media, fonts and CSS are aborted unless `load_assets` is set.
+    If `journal_path` is given, each page is appended there as a JSONL
+    record as soon as it is crawled, so a killed run keeps its progress.
+
+    Returns the adjacency as parallel arrays (urls, offsets, flat_links):
+    the links of urls[i] are flat_links[offsets[i]:offsets[i + 1]].
+    Links are kept in discovery order; adjacency_dict() sorts them into
+    { url: [links...] } for output.
     """
     visited = set()
-    queue = deque([start_url])
-    pages = {}
+    queue = asyncio.Queue()
+    queue.put_nowait(start_url)
+    enqueued = {start_url}  # every URL ever queued; superset of visited
+    # Append-only adjacency: no per-page list objects or dict rehashing
+    urls = []
+    offsets = [0]
+    flat_links = []
+    in_flight = 0  # pages being rendered; counted against max_pages
+    held = []  # URLs skipped only because in-flight pages filled the budget
 
     base_root = root_domain(start_url)
+    base_root_dot = "." + base_root
     print("[root-domain]", base_root)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)  # H2: headed mode
-        tab = browser.new_page()
-
-        while queue and len(pages) < max_pages:
-            url = queue.popleft()
-            if url in visited:
-                continue
-            visited.add(url)
-
-            print("\n[render]", url)
+    # Workers share one event loop; visited/urls/queue updates below have
+    # no await in between, so they never interleave.
+    async def worker(tab):
+        nonlocal in_flight
+        while True:
+            url = await queue.get()
             try:
-                tab.goto(url, timeout=60000, wait_until="domcontentloaded")
-            except TimeoutError:
-                print("[timeout]", url)
-            except Exception as e:
-                print("[goto-error]", url, "->", e)
-                continue
-
-            # Scroll a bit to trigger lazy loads
-            try:
-                last_height = 0
-                for _ in range(10):
-                    tab.mouse.wheel(0, 2000)
-                    time.sleep(0.3)
-                    new_height = tab.evaluate("document.body.scrollHeight")
-                    if new_height == last_height:
+                if url in visited or len(urls) >= max_pages:
+                    continue
+                if len(urls) + in_flight >= max_pages:
+                    # Budget may free up if an in-flight page fails
+                    held.append(url)
+                    continue
+                visited.add(url)
+
+                in_flight += 1
+                try:
+                    all_links = await crawl_page(tab, url, base_root, base_root_dot, open_context)
+                finally:
+                    in_flight -= 1
+                if all_links is None:
+                    # Failed pages don't use budget: give a held URL the slot
+                    if held:
+                        queue.put_nowait(held.pop(0))
+                    continue
+
+                urls.append(url)
+                flat_links.extend(all_links)
+                offsets.append(len(flat_links))
+                if journal is not None:
+                    record = to_json_bytes({"url": url, "links": list(all_links)}) + b"\n"
+                    await asyncio.to_thread(_append_record, journal, record)
+
+                # Queue further URLs, up to max_pages * 2 pages + queued
+                room = max_pages * 2 - len(urls) - queue.qsize()
+                for link in all_links:
+                    if room <= 0:
                         break
-                    last_height = new_height
+                    if link not in enqueued:
+                        enqueued.add(link)
+                        queue.put_nowait(link)
+                        room -= 1
             except Exception as e:
-                print("[scroll-error]", url, "->", e)
+                print("[worker-error]", url, "->", e)
+            finally:
+                queue.task_done()
+
+    journal = open(journal_path, "wb") if journal_path else None
+    try:
+        async with browser_handle(headless=headless) as browser:
+            async def open_context():
+                """New context with this crawl's asset blocking applied."""
+                ctx = await browser.new_context()
+                if not load_assets:
+                    await ctx.route("**/*", block_assets)
+                return ctx
+
+            # Set up every tab before starting workers, so a setup failure
+            # raises here instead of leaving queue.join() waiting forever
+            contexts = []
+            tabs = []
+            for _ in range(max(1, concurrency)):
+                ctx = await open_context()
+                contexts.append(ctx)
+                tabs.append(await ctx.new_page())
+            workers = [asyncio.create_task(worker(tab)) for tab in tabs]
+
+            await queue.join()
+
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for ctx in contexts:
+                await ctx.close()
+    finally:
+        if journal is not None:
+            journal.close()
+
+    return urls, offsets, flat_links
+
+
+def adjacency_dict(urls, offsets, flat_links):
+    """Materialize crawl()'s parallel arrays as { url: [sorted links...] }."""
+    return {
+        url: sorted(flat_links[offsets[i]:offsets[i + 1]])
+        for i, url in enumerate(urls)
+    }
+
+
+def _append_record(f, record: bytes):
+    """Write one JSONL record and flush it (runs off the event loop)."""
+    f.write(record)
+    f.flush()
+
+
+async def block_assets(route):
+    """Route handler: abort asset requests, let documents/scripts/XHR through."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def render_page(tab, url: str) -> bool:
+    """
+    Load url in tab and settle it: networkidle, scroll for lazy loads,
+    expand menus. False if the page could not be reached at all.
+    """
+    try:
+        await tab.goto(url, timeout=15000, wait_until="networkidle")
+    except TimeoutError:
+        print("[timeout]", url)
+    except Exception as e:
+        print("[goto-error]", url, "->", e)
+        return False
 
-            # Expand menus (best effort)
-            expand_menus(tab)
-            time.sleep(0.4)
+    # Scroll to trigger lazy loads, then wait (bounded) for them to land
+    try:
+        await tab.evaluate(_SCROLL_JS)
+    except Exception as e:
+        print("[scroll-error]", url, "->", e)
+    try:
+        await tab.wait_for_load_state("networkidle", timeout=5000)
+    except TimeoutError:
+        pass
+    except Exception as e:
+        print("[idle-error]", url, "->", e)
 
-            # Extract links from DOM
-            html_links = extract_links_from_dom(tab, base_root)
+    # Expand menus (best effort)
+    await expand_menus(tab)
+    return True
 
-            # Limited click-discovery
-            click_links = click_discover(tab, base_root, max_clicks=5)
 
-            all_links = html_links | click_links
+async def crawl_page(tab, url: str, base_root: str, base_root_dot: str, open_context):
+    """Render one URL and return its internal links (None if unreachable)."""
+    print("\n[render]", url)
+    if not await render_page(tab, url):
+        return None
 
-            print(f"[page-links] total={len(all_links)}  (html={len(html_links)}, click={len(click_links)})")
+    # Extract links from DOM
+    html_links = await extract_links_from_dom(tab, base_root, base_root_dot)
 
-            pages[url] = sorted(all_links)
+    # Limited click-discovery
+    click_links = await click_discover(tab, base_root, base_root_dot, open_context, max_clicks=5)
 
-            # Queue further URLs
-            for link in all_links:
-                if link not in visited and len(pages) + len(queue) < max_pages * 2:
-                    queue.append(link)
+    all_links = html_links | click_links
 
-        browser.close()
+    print(f"[page-links] total={len(all_links)}  (html={len(html_links)}, click={len(click_links)})")
 
-    return pages
+    return all_links
 
 
 # -------------------------------------------------------
 # BUILD TREE (T3, F1, R3)
 # -------------------------------------------------------
 
-def build_tree_from_pages(pages):
+def build_tree_from_pages(urls, flat_links):
     """
-    Build hierarchical tree from adjacency dict.
+    Build hierarchical tree from crawl()'s crawled URLs and their links.
 
     Tree format:
         {
@@ -279,11 +527,11 @@ def build_tree_from_pages(pages):
           "children": [...]
         }
     """
-    if not pages:
+    if not urls:
         return {}
 
-    first_url = next(iter(pages.keys()))
-    p = urlparse(first_url)
+    first_url = urls[0]
+    p = _pu(first_url)
     scheme = p.scheme or "https"
     domain = p.netloc
 
@@ -291,77 +539,89 @@ def build_tree_from_pages(pages):
         "name": f"{domain}/",
         "url": f"{scheme}://{domain}/",
         "children": [],
-        "_path": "",
     }
 
-    # Collect all URLs (keys + adjacency)
-    all_urls = set(pages.keys())
-    for links in pages.values():
-        all_urls |= set(links)
+    # Collect all URLs (crawled + linked)
+    all_urls = set(urls)
+    all_urls.update(flat_links)
 
     # Filter to same domain exactly
     domain_urls = set()
     for url in all_urls:
         if not url:
             continue
-        pu = urlparse(url)
+        pu = _pu(url)
         if pu.netloc == domain:
             domain_urls.add(url)
 
-    def find_or_create_child(parent, seg_path, label):
-        for child in parent["children"]:
-            if child["_path"] == seg_path:
-                return child
-        new_child = {
-            "name": label,   # path-only label, e.g. "/downloads/windows"
-            "url": None,
-            "children": [],
-            "_path": seg_path,
-        }
-        parent["children"].append(new_child)
-        return new_child
-
+    paths = []
+    path_urls = []
     for url in sorted(domain_urls):
-        pu = urlparse(url)
-        path = pu.path or "/"
-        path = path.split("#", 1)[0]
+        # Every URL came through normalize(), so there is no "#" or "?" to strip
+        assert "#" not in url and "?" not in url, url
+        path = _pu(url).path or "/"
 
         # root-level path is represented by root node already
         if path == "/" or path == "":
             continue
 
-        segments = [seg for seg in path.strip("/").split("/") if seg]
-        node = root
-        accum = ""
+        paths.append(path)
+        path_urls.append(url)
 
-        for seg in segments:
-            accum = accum + "/" + seg if accum else "/" + seg
-            seg_path = accum
-            label = seg_path  # F1: label is the full path (starting with "/")
-            node = find_or_create_child(node, seg_path, label)
+    edges, leaf_of = build_children_index(paths)
 
-        node["url"] = url
+    # Node i of the index is nodes[i]; edges arrive parent-first
+    nodes = [root]
+    for parent_idx, _, seg_path in edges:
+        node = {
+            "name": seg_path,   # F1: label is the full path, e.g. "/downloads/windows"
+            "url": None,
+            "children": [],
+        }
+        nodes.append(node)
+        nodes[parent_idx]["children"].append(node)
 
-    # Cleanup internal key
-    def clean(n):
-        n.pop("_path", None)
-        for c in n.get("children", []):
-            clean(c)
+    for url, idx in zip(path_urls, leaf_of):
+        nodes[idx]["url"] = url
 
-    clean(root)
     return root
 
 
+def build_children_index(paths):
+    """
+    Flatten URL paths into tree edges using one dict of prefix paths.
+
+    Returns (edges, leaf_of): edges is a list of (parent_idx, self_idx,
+    seg_path) in creation order with index 0 as the root, and leaf_of[i]
+    is the node index that paths[i] ends at.
+    """
+    index = {"": 0}
+    edges = []
+    leaf_of = []
+
+    for path in paths:
+        node_idx = 0
+        accum = ""
+        for seg in path.strip("/").split("/"):
+            if not seg:
+                continue
+            accum = accum + "/" + seg
+            idx = index.get(accum)
+            if idx is None:
+                idx = len(index)
+                index[accum] = idx
+                edges.append((node_idx, idx, accum))
+            node_idx = idx
+        leaf_of.append(node_idx)
+
+    return edges, leaf_of
+
+
 # -------------------------------------------------------
 # D3 HTML VIEWER
 # -------------------------------------------------------
 
-def save_tree_html(tree, out_html: str):
-    """Save D3 left-to-right tree viewer HTML."""
-    os.makedirs(os.path.dirname(out_html), exist_ok=True)
-    json_str = json.dumps(tree, indent=2, ensure_ascii=False)
-
-    template = """
+_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
@@ -570,9 +830,21 @@ window.addEventListener("resize", () => {
 </html>
 """
 
-    html = template.replace("__JSON__", json_str)
-    with open(out_html, "w", encoding="utf-8") as f:
-        f.write(html)
+# Split once at the data marker; save_tree_html writes the JSON in between
+_TEMPLATE_HEAD, _TEMPLATE_TAIL = (
+    part.encode("utf-8") for part in _TEMPLATE.split("__JSON__")
+)
+
+
+def save_tree_html(tree, out_html: str):
+    """Save D3 left-to-right tree viewer HTML."""
+    os.makedirs(os.path.dirname(out_html), exist_ok=True)
+
+    with open(out_html, "wb") as f:
+        f.write(_TEMPLATE_HEAD)
+        # Compact: the viewer only parses it; tree_final.json stays pretty
+        f.write(to_json_bytes(tree))
+        f.write(_TEMPLATE_TAIL)
 
     print("✔ HTML saved →", out_html)
 
@@ -585,6 +857,9 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--url", required=True, help="Start URL (e.g., https://python.org)")
     parser.add_argument("--max-pages", type=int, default=50, help="Maximum pages to crawl")
+    parser.add_argument("--concurrency", type=int, default=4, help="Browser contexts crawling in parallel")
+    parser.add_argument("--load-assets", action="store_true", help="Load images/fonts/media/CSS (blocked by default)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window (debugging)")
     args = parser.parse_args()
 
     start_url = normalize(args.url)
@@ -592,19 +867,28 @@ def main():
         start_url = "https://" + start_url
 
     print("[start-url]", start_url)
-    pages = crawl(start_url, max_pages=args.max_pages)
-
     os.makedirs("outputs", exist_ok=True)
 
+    journal_path = os.path.join("outputs", "sitemap_hier.jsonl")
+    urls, offsets, flat_links = asyncio.run(crawl(
+        start_url,
+        max_pages=args.max_pages,
+        concurrency=args.concurrency,
+        load_assets=args.load_assets,
+        headless=not args.headed,
+        journal_path=journal_path,
+    ))
+    print("✔ Per-page JSONL saved →", journal_path)
+
     raw_json_path = os.path.join("outputs", "sitemap_hier.json")
-    with open(raw_json_path, "w", encoding="utf-8") as f:
-        json.dump(pages, f, indent=2, ensure_ascii=False)
+    with open(raw_json_path, "wb") as f:
+        f.write(to_json_bytes(adjacency_dict(urls, offsets, flat_links), pretty=True))
     print("✔ Raw adjacency JSON saved →", raw_json_path)
 
-    tree = build_tree_from_pages(pages)
+    tree = build_tree_from_pages(urls, flat_links)
     tree_json_path = os.path.join("outputs", "tree_final.json")
-    with open(tree_json_path, "w", encoding="utf-8") as f:
-        json.dump(tree, f, indent=2, ensure_ascii=False)
+    with open(tree_json_path, "wb") as f:
+        f.write(to_json_bytes(tree, pretty=True))
     print("✔ Tree JSON saved →", tree_json_path)
 
     html_path = os.path.join("outputs", "sitemap_tree_final.html")
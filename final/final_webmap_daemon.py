@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+final_webmap_daemon.py
+
+Keep one warm Chromium running so repeated final_webmap.py crawls skip
+browser cold start (process spawn, profile init). Like final_webmap.py
+it runs headless unless --headed is given.
+
+Usage:
+    python final_webmap_daemon.py --port 9222
+    WEBMAP_DAEMON=1 python final_webmap.py --url https://python.org
+
+final_webmap.py attaches over CDP (WEBMAP_CDP_ENDPOINT, default
+http://127.0.0.1:9222). Stop the daemon with Ctrl+C.
+"""
+
+import time
+import argparse
+
+from playwright.sync_api import sync_playwright
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9222, help="Remote debugging (CDP) port")
+    parser.add_argument("--headed", action="store_true", help="Show the warm browser window (debugging)")
+    args = parser.parse_args()
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(
+            headless=not args.headed,
+            args=[f"--remote-debugging-port={args.port}"],
+        )
+        print(f"✔ Chromium ready → http://127.0.0.1:{args.port}")
+        print("  export WEBMAP_DAEMON=1 to reuse it; Ctrl+C to stop")
+
+        try:
+            while browser.is_connected():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()